@@ -5,19 +5,44 @@
 Python logging handlers that send messages in the
 Graylog Extended Log Format (GELF).
 Modules:
+ + :mod:`.asynchronous` - Asynchronous GELF Logging Handler wrapper
+ + :mod:`.compress` - Optional Zstandard compression of GELF logs
  + :mod:`.http` - HTTP GELF Logging Handlers
  + :mod:`.tcp` - TCP GELF Logging Handler
  + :mod:`.tls` - TLS GELF Logging Handler
  + :mod:`.udp` - UDP GELF Logging Handler
 """
 
+import importlib
+
 from graylog.handlers import (
     WAN_CHUNK,
     LAN_CHUNK,
 )
-from graylog.http import GELFHTTPHandler
-from graylog.tcp import GELFTCPHandler
-from graylog.tls import GELFTLSHandler
-from graylog.udp import GELFUDPHandler
+
+# handlers are imported on first access so that only the modules (and their
+# dependencies, e.g. ssl or http.client) of the used transports are loaded
+_LAZY_HANDLERS = {
+    "AsyncGELFHandler": "graylog.asynchronous",
+    "GELFHTTPHandler": "graylog.http",
+    "GELFTCPHandler": "graylog.tcp",
+    "GELFTLSHandler": "graylog.tls",
+    "GELFUDPHandler": "graylog.udp",
+}
+
+__all__ = ["WAN_CHUNK", "LAN_CHUNK", *_LAZY_HANDLERS]
+
+
+def __getattr__(name):
+    if name in _LAZY_HANDLERS:
+        handler = getattr(importlib.import_module(_LAZY_HANDLERS[name]), name)
+        globals()[name] = handler
+        return handler
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_HANDLERS))
+
 
 __version__ = (0, 3, 1)
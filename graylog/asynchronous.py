@@ -0,0 +1,99 @@
+import collections.abc
+import copy
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class _GELFQueueListener(QueueListener):
+    """:class:`logging.handlers.QueueListener` that waits for room in a
+    bounded queue when stopping instead of failing"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class AsyncGELFHandler(QueueHandler):
+    """Asynchronous wrapper around a GELF handler
+
+    Records are put onto a queue and sent to Graylog by the wrapped handler
+    from a background thread, so logging calls do not wait on network I/O.
+    """
+
+    def __init__(self, handler, maxsize=0, block=False):
+        """Initialize the AsyncGELFHandler
+
+        :param handler: GELF handler (e.g. :class:`.udp.GELFUDPHandler`)
+            sending the queued records to Graylog.
+        :type handler: BaseGELFHandler
+
+        :param maxsize: Maximum number of queued records. If ``0`` the queue
+            is unbounded.
+        :type maxsize: int
+
+        :param block: Overflow policy of a bounded queue. If :obj:`True` wait
+            for room in the queue, otherwise drop the record.
+        :type block: bool
+        """
+        QueueHandler.__init__(
+            self, queue.Queue(maxsize) if maxsize > 0 else queue.SimpleQueue()
+        )
+        self.handler = handler
+        self.block = block
+        self._listener = _GELFQueueListener(
+            self.queue, handler, respect_handler_level=True
+        )
+        self._listener.start()
+
+    def prepare(self, record):
+        """Snapshot a record before queuing it
+
+        As in :meth:`logging.handlers.QueueHandler.prepare` the message is
+        merged with its arguments, so arguments changed after the logging
+        call are not sent with their new value. Unlike it, the exception
+        information and a copy of mapping arguments are kept, as the
+        wrapped handler needs them to build the GELF log.
+
+        :param record: :class:`logging.LogRecord` to queue.
+        :type record: logging.LogRecord
+
+        :return: Copy of the given record with its message merged.
+        :rtype: logging.LogRecord
+        """
+        message = record.getMessage()
+        record = copy.copy(record)
+        if isinstance(record.args, collections.abc.Mapping):
+            # getMessage() formats the message with the mapping arguments
+            # again, escape it so they leave it unchanged
+            record.msg = message.replace("%", "%%")
+            record.args = dict(record.args)
+        else:
+            record.msg = message
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        """Put a record onto the queue, applying the overflow policy
+
+        Records are dropped once the handler is closed, as nothing drains
+        the queue anymore.
+
+        :param record: :class:`logging.LogRecord` to queue.
+        :type record: logging.LogRecord
+        """
+        if self._listener is None:
+            return
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def close(self):
+        """Send the queued records, then close the wrapped handler"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        self.handler.close()
+        QueueHandler.close(self)
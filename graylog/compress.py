@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Optional Zstandard compression of GELF logs
+
+.. attention::
+    Stock Graylog inputs only understand zlib and gzip compressed GELF
+    logs. Zstandard compressed GELF logs require a receiving input that
+    speaks Zstandard and, when a dictionary is used, the very same
+    dictionary.
+
+    :class:`.handlers.GELFTruncatingChunker` only supports zlib compressed
+    GELF logs, :class:`.udp.GELFUDPHandler` rejects it combined with a
+    Zstandard ``compressor``.
+"""
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+ZSTD_DICT = "zstd_dict"
+
+COMPRESSORS = (ZLIB, ZSTD, ZSTD_DICT)
+
+
+def make_zstd_compressor(compressor, compress_level, zstd_dict_path=None):
+    """Create a :class:`zstandard.ZstdCompressor` for GELF logs
+
+    :mod:`zstandard` is only imported when this is called.
+
+    :param compressor: Either ``"zstd"`` or ``"zstd_dict"``.
+    :type compressor: str
+
+    :param compress_level: Zstandard compression level.
+    :type compress_level: int
+
+    :param zstd_dict_path: Path to a Zstandard dictionary trained on
+        representative GELF logs. Required for ``"zstd_dict"``.
+    :type zstd_dict_path: str or None
+
+    :return: Zstandard compression context.
+    :rtype: zstandard.ZstdCompressor
+    """
+    if compressor not in (ZSTD, ZSTD_DICT):
+        raise ValueError("unsupported Zstandard compressor: {}".format(compressor))
+    if compressor == ZSTD_DICT and zstd_dict_path is None:
+        raise ValueError("'zstd_dict_path' must be specified for 'zstd_dict'")
+
+    import zstandard  # pylint: disable=import-outside-toplevel,import-error
+
+    if compressor == ZSTD:
+        return zstandard.ZstdCompressor(level=compress_level)
+
+    with open(zstd_dict_path, "rb") as fp:
+        dict_data = zstandard.ZstdCompressionDict(fp.read())
+    return zstandard.ZstdCompressor(level=compress_level, dict_data=dict_data)
@@ -7,14 +7,19 @@ import abc
 import datetime
 import json
 import logging
-import math
-import random
+import os
 import socket
 import struct
 import sys
 import traceback
 import warnings
-import zlib
+
+from graylog.compress import COMPRESSORS, ZLIB, make_zstd_compressor
+
+try:
+    from zlib_ng import zlib_ng as zlib
+except ImportError:
+    import zlib
 
 WAN_CHUNK = 1420
 LAN_CHUNK = 8154
@@ -32,9 +37,22 @@ else:
     ABC = abc.ABCMeta(str("ABC"), (), {})
 
 try:
-    import httplib
+    import orjson
 except ImportError:
-    import http.client as httplib
+    orjson = None
+    _ORJSON_OPTIONS = None
+else:
+    try:
+        _ORJSON_OPTIONS = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_SUBCLASS
+        )
+    except AttributeError:
+        # the passthrough options require orjson 3.3.0+, fall back to json
+        orjson = None
+        _ORJSON_OPTIONS = None
 
 SYSLOG_LEVELS = {
     logging.CRITICAL: 2,
@@ -46,6 +64,38 @@ SYSLOG_LEVELS = {
 
 GELF_MAX_CHUNK_NUMBER = 128
 
+# value types that can be JSON serialized without any sanitation, exact
+# types are checked as ``bool`` (a subclass of ``int``) must be sanitized
+_PLAIN_JSON_TYPES = frozenset((text, int, float, type(None)))
+
+# standard LogRecord attributes that are skipped when adding extra fields
+_SKIP_FIELDS = frozenset(
+    (
+        "args",
+        "asctime",
+        "created",
+        "exc_info",
+        "exc_text",
+        "filename",
+        "funcName",
+        "id",
+        "levelname",
+        "levelno",
+        "lineno",
+        "module",
+        "msecs",
+        "message",
+        "msg",
+        "name",
+        "pathname",
+        "process",
+        "processName",
+        "relativeCreated",
+        "thread",
+        "threadName",
+    )
+)
+
 
 class BaseGELFHandler(logging.Handler, ABC):
     """Abstract class defining the basic functionality of converting a
@@ -63,6 +113,9 @@ class BaseGELFHandler(logging.Handler, ABC):
             facility=None,
             level_names=False,
             compress=True,
+            compress_level=1,
+            compressor=ZLIB,
+            zstd_dict_path=None,
     ):
         """Initialize the BaseGELFHandler
 
@@ -98,6 +151,21 @@ class BaseGELFHandler(logging.Handler, ABC):
         :param compress: If :obj:`True` compress the GELF message before
             sending it to the Graylog server.
         :type compress: bool
+
+        :param compress_level: Compression level of the ``compressor`` used
+            when ``compress`` is :obj:`True`. Defaults to ``1`` favoring speed
+            over size.
+        :type compress_level: int
+
+        :param compressor: Compression algorithm used when ``compress`` is
+            :obj:`True`. One of ``"zlib"`` (default), ``"zstd"`` or
+            ``"zstd_dict"``. See :mod:`.compress` for the Zstandard options,
+            which require the Graylog input to support them.
+        :type compressor: str
+
+        :param zstd_dict_path: Path to the Zstandard dictionary used by the
+            ``"zstd_dict"`` compressor.
+        :type zstd_dict_path: str or None
         """
         logging.Handler.__init__(self)
         self.debugging_fields = debugging_fields
@@ -109,9 +177,36 @@ class BaseGELFHandler(logging.Handler, ABC):
 
         self.fqdn = fqdn
         self.localname = localname
+        # resolve the ``host`` GELF field once instead of for every record
+        self._host = self._resolve_host(fqdn, localname)
         self.facility = facility
         self.level_names = level_names
         self.compress = compress
+        self.compress_level = compress_level
+
+        if compressor not in COMPRESSORS:
+            raise ValueError("unsupported compressor: {}".format(compressor))
+
+        self.compressor = compressor
+        self._cctx = None
+        if compress and compressor != ZLIB:
+            self._cctx = make_zstd_compressor(compressor, compress_level, zstd_dict_path)
+
+    def handle(self, record):
+        """Skip building and sending a GELF log for records below the
+        handler's level
+
+        :class:`logging.Logger` already applies this check before calling
+        its handlers, but records passed directly to :meth:`handle` (e.g.
+        by a :class:`logging.handlers.QueueListener`) would otherwise
+        still be converted into GELF logs.
+
+        :param record: :class:`logging.LogRecord` to handle.
+        :type record: logging.LogRecord
+        """
+        if record.levelno < self.level:
+            return False
+        return logging.Handler.handle(self, record)
 
     # noinspection PyPep8Naming
     def makePickle(self, record):
@@ -126,8 +221,14 @@ class BaseGELFHandler(logging.Handler, ABC):
         """
         gelf_dict = self._make_gelf_dict(record)
         packed = self._pack_gelf_dict(gelf_dict)
-        pickle = zlib.compress(packed) if self.compress else packed
-        return pickle
+        # every GELF log must be a standalone zlib stream (header and adler32
+        # trailer included), thus, a shared compressobj flushed with
+        # Z_FULL_FLUSH cannot be reused across logs
+        if not self.compress:
+            return packed
+        if self._cctx is not None:
+            return self._cctx.compress(packed)
+        return zlib.compress(packed, self.compress_level)
 
     def _make_gelf_dict(self, record):
         """Create a dictionary representing a GELF log from a
@@ -142,7 +243,7 @@ class BaseGELFHandler(logging.Handler, ABC):
         # construct the base GELF format
         gelf_dict = {
             "version": "1.0",
-            "host": self._resolve_host(self.fqdn, self.localname),
+            "host": self._host,
             "short_message": self.formatter.format(record)
             if self.formatter
             else record.getMessage(),
@@ -214,14 +315,13 @@ class BaseGELFHandler(logging.Handler, ABC):
         :type record: logging.LogRecord
         """
         # if a traceback exists add it to the log as the full_message field
-        full_message = None
-        # format exception information if present
-        if record.exc_info:
+        # prefer pre-formatted exception information (e.g. filled in by a
+        # formatter or kept after LogRecord serialization) as formatting
+        # a traceback is expensive
+        full_message = record.exc_text
+        # otherwise format exception information if present
+        if not full_message and record.exc_info:
             full_message = "\n".join(traceback.format_exception(*record.exc_info))
-        # use pre-formatted exception information in cases where the primary
-        # exception information was removed, e.g. for LogRecord serialization
-        if record.exc_text:
-            full_message = record.exc_text
         if full_message:
             gelf_dict["full_message"] = full_message
 
@@ -256,15 +356,11 @@ class BaseGELFHandler(logging.Handler, ABC):
             fields from to insert into the given ``gelf_dict``.
         :type record: logging.LogRecord
         """
-        gelf_dict.update(
-            {
-                "file": record.pathname,
-                "line": record.lineno,
-                "_function": record.funcName,
-                "_pid": record.process,
-                "_thread_name": record.threadName,
-            }
-        )
+        gelf_dict["file"] = record.pathname
+        gelf_dict["line"] = record.lineno
+        gelf_dict["_function"] = record.funcName
+        gelf_dict["_pid"] = record.process
+        gelf_dict["_thread_name"] = record.threadName
         # record.processName was added in Python 2.6.2
         pn = getattr(record, "processName", None)
         if pn is not None:
@@ -293,42 +389,18 @@ class BaseGELFHandler(logging.Handler, ABC):
             from to insert into the given ``gelf_dict``.
         :type record: logging.LogRecord
         """
-        # skip_list is used to filter additional fields in a log message.
-        skip_list = (
-            "args",
-            "asctime",
-            "created",
-            "exc_info",
-            "exc_text",
-            "filename",
-            "funcName",
-            "id",
-            "levelname",
-            "levelno",
-            "lineno",
-            "module",
-            "msecs",
-            "message",
-            "msg",
-            "name",
-            "pathname",
-            "process",
-            "processName",
-            "relativeCreated",
-            "thread",
-            "threadName",
-        )
-
-        for key, value in record.__dict__.items():
-            if key not in skip_list and not key.startswith("_"):
-                gelf_dict["_%s" % key] = value
+        record_dict = record.__dict__
+        for key in record_dict.keys() - _SKIP_FIELDS:
+            if key[:1] != "_":
+                gelf_dict["_" + key] = record_dict[key]
 
     @staticmethod
     def _add_args_fields(gelf_dict, record):
         if not isinstance(record.args, dict):
             return
         for key, value in record.args.items():
-            gelf_dict["_%s" % key] = value
+            # args keys are not necessarily strings
+            gelf_dict["_" + key if type(key) is text else "_%s" % key] = value
 
     @classmethod
     def _pack_gelf_dict(cls, gelf_dict):
@@ -336,7 +408,16 @@ class BaseGELFHandler(logging.Handler, ABC):
         creating an uncompressed GELF log ready for consumption by Graylog.
 
         Since we cannot be 100% sure of what is contained in the ``gelf_dict``
-        we have to do some sanitation.
+        we have to do some sanitation. It is skipped in the common case where
+        every key is a string and every value is a plain JSON scalar.
+
+        If :mod:`orjson` is installed it is used to serialize the
+        ``gelf_dict``, otherwise the standard library :mod:`json` is used.
+        Date/time objects, dataclasses and subclasses of the JSON types are
+        passed through to :meth:`_object_to_json` so both produce the same
+        GELF log, except that :mod:`orjson` serializes :class:`uuid.UUID`
+        and :class:`enum.Enum` objects into their value instead of their
+        ``repr`` and ``NaN``/``Infinity`` floats into ``null``.
 
         :param gelf_dict: Dictionary representing a GELF log.
         :type gelf_dict: dict
@@ -344,7 +425,20 @@ class BaseGELFHandler(logging.Handler, ABC):
         :return: Bytes representing an uncompressed GELF log.
         :rtype: bytes
         """
-        gelf_dict = cls._sanitize_to_unicode(gelf_dict)
+        for key, value in gelf_dict.items():
+            if type(key) is not text or type(value) not in _PLAIN_JSON_TYPES:
+                gelf_dict = cls._sanitize_to_unicode(gelf_dict)
+                break
+        if orjson is not None:
+            try:
+                return orjson.dumps(
+                    gelf_dict,
+                    default=cls._object_to_json,
+                    option=_ORJSON_OPTIONS,
+                )
+            except TypeError:
+                # e.g. integers larger than 64 bits, let json handle them
+                pass
         packed = json.dumps(gelf_dict, separators=(",", ":"), default=cls._object_to_json)
         return packed.encode("utf-8")
 
@@ -377,16 +471,31 @@ class BaseGELFHandler(logging.Handler, ABC):
         into their string representation (for later JSON serialization).
 
         :class:`datetime.datetime` based objects will be converted into a
-        ISO formatted timestamp string.
+        ISO formatted timestamp string. Bytes will be decoded as UTF-8.
+        Subclasses of the JSON types, which :mod:`orjson` passes through,
+        will be converted into their base type as :mod:`json` does.
 
-        :param obj: Object to convert into a string representation.
+        :param obj: Object to convert into a JSON serializable object.
         :type obj: object
 
-        :return: String representing the given object.
-        :rtype: str
+        :return: String representing the given object, or the given
+            object converted into its base JSON type.
+        :rtype: str or int or float or dict or list
         """
         if isinstance(obj, datetime.datetime):
             return obj.isoformat()
+        if isinstance(obj, data):
+            return obj.decode("utf-8", errors="replace")
+        if isinstance(obj, text):
+            return text.__str__(obj)
+        if isinstance(obj, int):
+            return int.__int__(obj)
+        if isinstance(obj, float):
+            return float.__float__(obj)
+        if isinstance(obj, dict):
+            return dict(obj)
+        if isinstance(obj, (list, tuple)):
+            return list(obj)
         return repr(obj)
 
 
@@ -417,23 +526,14 @@ class BaseGELFChunker(object):
         :return: Number of chunks the specified GELF message requires.
         :rtype: int
         """
-        return int(math.ceil(len(message) * 1.0 / self.chunk_size))
-
-    @staticmethod
-    def _encode(message_id, chunk_seq, total_chunks, chunk):
-        return b"".join(
-            [
-                b"\x1e\x0f",
-                struct.pack("Q", message_id),
-                struct.pack("B", chunk_seq),
-                struct.pack("B", total_chunks),
-                chunk,
-            ]
-        )
+        return -(-len(message) // self.chunk_size)
 
     def _gen_gelf_chunks(self, message):
         """Generate and iter chunks for a GELF message
 
+        The chunk header is packed once per message, only its sequence
+        number byte is updated for each chunk.
+
         :param message: GELF message to generate and iter chunks for.
         :type: bytes
 
@@ -441,14 +541,11 @@ class BaseGELFChunker(object):
         :rtype: Iterator[bytes]
         """
         total_chunks = self._message_chunk_number(message)
-        message_id = random.randint(0, 0xFFFFFFFFFFFFFFFF)
-        for sequence, chunk in enumerate(
-                (
-                        message[i: i + self.chunk_size]
-                        for i in range(0, len(message), self.chunk_size)
-                )
-        ):
-            yield self._encode(message_id, sequence, total_chunks, chunk)
+        header = bytearray(b"\x1e\x0f" + os.urandom(8) + struct.pack("BB", 0, total_chunks))
+        view = memoryview(message)
+        for sequence, i in enumerate(range(0, len(message), self.chunk_size)):
+            header[10] = sequence
+            yield b"".join((header, view[i: i + self.chunk_size]))
 
     def chunk_message(self, message):
         """Chunk a GELF message
@@ -519,6 +616,40 @@ class GELFTruncatingChunker(BaseGELFChunker):
         self.gelf_packer = gelf_packer
         self.compress = compress
 
+    def _pack_gelf_log(self, gelf_dict):
+        """Pack, and compress if needed, a GELF dictionary
+
+        :param gelf_dict: Dictionary representing a GELF log.
+        :type gelf_dict: dict
+
+        :return: Bytes representing a GELF log.
+        :rtype: bytes
+        """
+        packed_message = self.gelf_packer(gelf_dict)
+        if self.compress:
+            packed_message = zlib.compress(packed_message)
+        return packed_message
+
+    def _pack_truncated_gelf_log(self, simplified_gelf_dict, short_message):
+        """Pack a simplified GELF dictionary with the given truncated
+        ``short_message``
+
+        :param simplified_gelf_dict: Simplified GELF dictionary.
+        :type simplified_gelf_dict: dict
+
+        :param short_message: Truncated ``short_message``.
+        :type short_message: str
+
+        :return: Bytes representing the truncated GELF log or :obj:`None` if
+            it still chunk overflows.
+        :rtype: bytes or None
+        """
+        simplified_gelf_dict["short_message"] = short_message
+        packed_message = self._pack_gelf_log(simplified_gelf_dict)
+        if self._message_chunk_number(packed_message) <= GELF_MAX_CHUNK_NUMBER:
+            return packed_message
+        return None
+
     def gen_chunk_overflow_gelf_log(self, raw_message):
         """Attempt to truncate a chunk overflowing GELF message
 
@@ -549,28 +680,35 @@ class GELFTruncatingChunker(BaseGELFChunker):
         # compute an estimate of the number of message chunks left this is
         # used to estimate the amount of truncation to apply
         gelf_chunks_free = GELF_MAX_CHUNK_NUMBER - self._message_chunk_number(
-            zlib.compress(self.gelf_packer(simplified_gelf_dict))
-            if self.compress
-            else self.gelf_packer(simplified_gelf_dict)
+            self._pack_gelf_log(simplified_gelf_dict)
         )
-        truncated_short_message = gelf_dict["short_message"][
-                                  : self.chunk_size * gelf_chunks_free
-                                  ]
-        for clip in range(gelf_chunks_free, -1, -1):
-            simplified_gelf_dict["short_message"] = truncated_short_message
-            packed_message = self.gelf_packer(simplified_gelf_dict)
-            if self.compress:
-                packed_message = zlib.compress(packed_message)
-            if self._message_chunk_number(packed_message) <= GELF_MAX_CHUNK_NUMBER:
-                return packed_message
-            else:
-                truncated_short_message = truncated_short_message[: -self.chunk_size]
-        else:
+        short_message = gelf_dict["short_message"]
+        estimate = max(0, min(len(short_message), self.chunk_size * gelf_chunks_free))
+        truncated_message = self._pack_truncated_gelf_log(
+            simplified_gelf_dict, short_message[:estimate]
+        )
+        if truncated_message is None:
+            # the estimate still chunk overflows (e.g. for characters that
+            # pack into several bytes), binary search the longest fitting
+            # short_message prefix below it
+            low, high = 0, estimate - 1
+            while low <= high:
+                middle = (low + high) // 2
+                packed_message = self._pack_truncated_gelf_log(
+                    simplified_gelf_dict, short_message[:middle]
+                )
+                if packed_message is not None:
+                    truncated_message = packed_message
+                    low = middle + 1
+                else:
+                    high = middle - 1
+        if truncated_message is None:
             raise GELFTruncationFailureWarning(
                 "truncation failed preventing chunk overflowing for GELF message: {}".format(
                     raw_message
                 )
             )
+        return truncated_message
 
     def chunk_message(self, message):
         """Chunk a GELF message
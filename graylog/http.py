@@ -1,7 +1,16 @@
+import threading
 from http import client as httplib
 
+from graylog.compress import ZLIB
 from graylog.handlers import BaseGELFHandler
 
+# errors raised when reusing a keep-alive connection the server closed
+_STALE_CONNECTION_ERRORS = (
+    httplib.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
 
 class GELFHTTPHandler(BaseGELFHandler):
     """GELF HTTP handler"""
@@ -38,18 +47,71 @@ class GELFHTTPHandler(BaseGELFHandler):
         self.headers = {}
 
         if compress:
-            self.headers["Content-Encoding"] = "gzip,deflate"
+            self.headers["Content-Encoding"] = (
+                "gzip,deflate" if self.compressor == ZLIB else "zstd"
+            )
+
+        self._connection = None
+        self._http_lock = threading.Lock()
 
     def emit(self, record):
         """Convert a :class:`logging.LogRecord` to GELF and emit it to Graylog
         via an HTTP POST request
 
+        The GELF log is sent over a persistent keep-alive connection. The
+        reply has to be read before the connection can be reused, thus, this
+        blocks (while holding the handler's connection lock) until Graylog
+        replies or ``timeout`` expires. Wrap the handler in a
+        :class:`.asynchronous.AsyncGELFHandler` to send from a background
+        thread instead.
+
+        If a reused connection turns out to have been closed by the server
+        the GELF log is resent once over a new connection. It is never resent
+        after a timeout, as Graylog may have received it already.
+
         :param record: :class:`logging.LogRecord` to convert into a GELF log
             and emit to Graylog via an HTTP POST request.
         :type record: logging.LogRecord
         """
         pickle = self.makePickle(record)
-        connection = httplib.HTTPConnection(
-            host=self.host, port=self.port, timeout=self.timeout
-        )
-        connection.request("POST", self.path, pickle, self.headers)
+        with self._http_lock:
+            reused = self._connection is not None
+            try:
+                try:
+                    self._post(pickle)
+                except _STALE_CONNECTION_ERRORS:
+                    self._close_connection()
+                    if not reused:
+                        raise
+                    # the server closed the idle keep-alive connection
+                    # before handling the request, resend it once
+                    self._post(pickle)
+            except Exception:
+                self._close_connection()
+                self.handleError(record)
+
+    def _post(self, pickle):
+        """POST a GELF log over the persistent HTTP connection
+
+        :param pickle: Bytes representing a GELF log.
+        :type pickle: bytes
+        """
+        if self._connection is None:
+            self._connection = httplib.HTTPConnection(
+                host=self.host, port=self.port, timeout=self.timeout
+            )
+        self._connection.request("POST", self.path, pickle, self.headers)
+        # the response must be drained before the connection can be reused
+        self._connection.getresponse().read()
+
+    def _close_connection(self):
+        """Close and discard the persistent HTTP connection"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def close(self):
+        """Close the persistent HTTP connection and the handler"""
+        with self._http_lock:
+            self._close_connection()
+        BaseGELFHandler.close(self)
@@ -1,7 +1,7 @@
 import socket
 import ssl
 
-from graylog import GELFTCPHandler
+from graylog.tcp import GELFTCPHandler
 
 
 class GELFTLSHandler(GELFTCPHandler):
@@ -52,6 +52,25 @@ class GELFTLSHandler(GELFTCPHandler):
         self.reqs = ssl.CERT_REQUIRED if validate else ssl.CERT_NONE
         self.certfile = certfile
         self.keyfile = keyfile if keyfile else certfile
+        self._ssl_context = self._make_ssl_context()
+
+    def _make_ssl_context(self):
+        """Create the :class:`ssl.SSLContext` shared by all the TLS wrapped
+        sockets of this handler, so that the CA bundle and client
+        certificate are only loaded once instead of on every reconnect
+
+        :return: SSL context configured from the handler's arguments.
+        :rtype: ssl.SSLContext
+        """
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        # hostnames were never verified, only the certificate chain
+        context.check_hostname = False
+        context.verify_mode = self.reqs
+        if self.ca_certs is not None:
+            context.load_verify_locations(cafile=self.ca_certs)
+        if self.certfile is not None:
+            context.load_cert_chain(self.certfile, self.keyfile)
+        return context
 
     def makeSocket(self, timeout=1):
         """Create a TLS wrapped socket"""
@@ -60,12 +79,8 @@ class GELFTLSHandler(GELFTCPHandler):
         if hasattr(plain_socket, "settimeout"):
             plain_socket.settimeout(timeout)
 
-        wrapped_socket = ssl.wrap_socket(
-            plain_socket,
-            ca_certs=self.ca_certs,
-            cert_reqs=self.reqs,
-            keyfile=self.keyfile,
-            certfile=self.certfile,
+        wrapped_socket = self._ssl_context.wrap_socket(
+            plain_socket, server_hostname=self.host
         )
         wrapped_socket.connect((self.host, self.port))
 
@@ -1,6 +1,11 @@
 from logging.handlers import DatagramHandler
 
-from graylog.handlers import BaseGELFHandler, GELFWarningChunker
+from graylog.compress import ZLIB
+from graylog.handlers import (
+    BaseGELFHandler,
+    GELFTruncatingChunker,
+    GELFWarningChunker,
+)
 
 
 class GELFUDPHandler(BaseGELFHandler, DatagramHandler):
@@ -25,13 +30,38 @@ class GELFUDPHandler(BaseGELFHandler, DatagramHandler):
             handle chunking larger GELF messages.
         :type gelf_chunker: GELFWarningChunker
         """
+        if (
+                isinstance(gelf_chunker, GELFTruncatingChunker)
+                and gelf_chunker.compress
+                and kwargs.get("compress", True)
+                and kwargs.get("compressor", ZLIB) != ZLIB
+        ):
+            raise ValueError(
+                "GELFTruncatingChunker only supports zlib compressed GELF logs"
+            )
+
         BaseGELFHandler.__init__(self, **kwargs)
         DatagramHandler.__init__(self, host, port)
         self.gelf_chunker = gelf_chunker
 
     def send(self, s):
+        """Send a GELF log to Graylog, chunking it if it is too large to
+        fit into a single datagram
+
+        Each GELF chunk has to be sent as its own datagram, so the chunks
+        cannot be gathered into one ``sendmsg`` call. Instead the socket is
+        resolved once per log and its ``sendto`` is called directly for
+        every chunk.
+
+        :param s: Bytes representing a GELF log.
+        :type s: bytes
+        """
+        if self.sock is None:
+            self.createSocket()
+        sendto = self.sock.sendto
+        address = self.address
         if len(s) < self.gelf_chunker.chunk_size:
-            super(GELFUDPHandler, self).send(s)
+            sendto(s, address)
         else:
             for chunk in self.gelf_chunker.chunk_message(s):
-                super(GELFUDPHandler, self).send(chunk)
+                sendto(chunk, address)
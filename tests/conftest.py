@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pytest fixtures shared by the graylog tests"""
+
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def make_logger(request):
+    """Factory attaching a handler to a logger named after the test"""
+
+    def _make_logger(handler):
+        logger = logging.getLogger(request.node.name)
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        return logger
+
+    return _make_logger
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pytests for :class:`graylog.asynchronous.AsyncGELFHandler`"""
+
+import logging
+import threading
+
+from graylog.asynchronous import AsyncGELFHandler
+from graylog.handlers import BaseGELFHandler
+
+
+class RecordingGELFHandler(BaseGELFHandler):
+    """GELF handler recording the GELF dictionaries it would send"""
+
+    def __init__(self, **kwargs):
+        BaseGELFHandler.__init__(self, **kwargs)
+        self.gelf_dicts = []
+        self.sending = threading.Event()
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def emit(self, record):
+        self.sending.set()
+        self.unblocked.wait()
+        self.gelf_dicts.append(self._make_gelf_dict(record))
+
+
+def test_exc_info_and_args_fields_kept(make_logger):
+    handler = RecordingGELFHandler()
+    async_handler = AsyncGELFHandler(handler)
+    logger = make_logger(async_handler)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed %(user)s", {"user": "alice"})
+    async_handler.close()
+
+    (gelf_dict,) = handler.gelf_dicts
+    assert gelf_dict["short_message"] == "failed alice"
+    assert gelf_dict["_user"] == "alice"
+    assert "ValueError: boom" in gelf_dict["full_message"]
+
+
+def test_records_dropped_when_full(make_logger):
+    handler = RecordingGELFHandler()
+    handler.unblocked.clear()
+    async_handler = AsyncGELFHandler(handler, maxsize=1)
+    logger = make_logger(async_handler)
+
+    logger.info("sending")
+    # wait for the listener to block while sending the first record
+    assert handler.sending.wait(5)
+    logger.info("queued")
+    logger.info("dropped")
+    handler.unblocked.set()
+    async_handler.close()
+
+    assert [d["short_message"] for d in handler.gelf_dicts] == ["sending", "queued"]
+
+
+def test_records_kept_when_full_and_blocking(make_logger):
+    handler = RecordingGELFHandler()
+    async_handler = AsyncGELFHandler(handler, maxsize=1, block=True)
+    logger = make_logger(async_handler)
+    for i in range(20):
+        logger.info("message %d", i)
+    async_handler.close()
+
+    assert len(handler.gelf_dicts) == 20
+
+
+def test_close_drains_queue(make_logger):
+    handler = RecordingGELFHandler()
+    handler.unblocked.clear()
+    async_handler = AsyncGELFHandler(handler)
+    logger = make_logger(async_handler)
+    for i in range(50):
+        logger.info("message %d", i)
+    handler.unblocked.set()
+    async_handler.close()
+
+    assert [d["short_message"] for d in handler.gelf_dicts] == [
+        "message %d" % i for i in range(50)
+    ]
+
+
+def test_handler_level_respected(make_logger):
+    handler = RecordingGELFHandler()
+    handler.setLevel(logging.WARNING)
+    async_handler = AsyncGELFHandler(handler)
+    logger = make_logger(async_handler)
+    logger.info("filtered")
+    logger.warning("sent")
+    async_handler.close()
+
+    assert [d["short_message"] for d in handler.gelf_dicts] == ["sent"]
+
+
+def test_args_snapshot_when_logged(make_logger):
+    handler = RecordingGELFHandler()
+    handler.unblocked.clear()
+    async_handler = AsyncGELFHandler(handler)
+    logger = make_logger(async_handler)
+    items = [1]
+    logger.info("items %s", items)
+    logger.info("%(percent)s done", {"percent": "100%"})
+    items.append(2)
+    handler.unblocked.set()
+    async_handler.close()
+
+    assert [d["short_message"] for d in handler.gelf_dicts] == [
+        "items [1]",
+        "100% done",
+    ]
+    assert handler.gelf_dicts[1]["_percent"] == "100%"
+
+
+def test_records_dropped_after_close(make_logger):
+    handler = RecordingGELFHandler()
+    async_handler = AsyncGELFHandler(handler)
+    logger = make_logger(async_handler)
+    async_handler.close()
+    logger.info("dropped")
+
+    assert handler.gelf_dicts == []
+    assert async_handler.queue.empty()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pytests for the GELF UDP message chunkers of :mod:`graylog.handlers`"""
+
+import json
+import os
+import warnings
+import zlib
+
+from graylog.handlers import (
+    GELF_MAX_CHUNK_NUMBER,
+    BaseGELFChunker,
+    BaseGELFHandler,
+    GELFTruncatingChunker,
+)
+
+
+def make_gelf_dict(short_message, facility="test"):
+    return {
+        "version": "1.1",
+        "host": "localhost",
+        "short_message": short_message,
+        "timestamp": 1.0,
+        "level": 6,
+        "facility": facility,
+    }
+
+
+def test_chunk_header_layout():
+    chunker = BaseGELFChunker(chunk_size=10)
+    message = os.urandom(95)
+    chunks = list(chunker.chunk_message(message))
+
+    assert len(chunks) == 10
+    message_id = chunks[0][2:10]
+    for sequence, chunk in enumerate(chunks):
+        assert chunk[:2] == b"\x1e\x0f"
+        assert chunk[2:10] == message_id
+        assert chunk[10] == sequence
+        assert chunk[11] == len(chunks)
+        assert len(chunk) <= 12 + 10
+    assert b"".join(chunk[12:] for chunk in chunks) == message
+
+
+def test_chunk_message_ids_differ():
+    chunker = BaseGELFChunker(chunk_size=10)
+    first = next(chunker.chunk_message(b"x" * 20))
+    second = next(chunker.chunk_message(b"x" * 20))
+    assert first[2:10] != second[2:10]
+
+
+def test_chunk_overflow_dropped():
+    chunker = BaseGELFChunker(chunk_size=1)
+    assert list(chunker.chunk_message(b"x" * (GELF_MAX_CHUNK_NUMBER + 1))) == []
+
+
+def unchunk(chunks, compress):
+    message = b"".join(chunk[12:] for chunk in chunks)
+    if compress:
+        message = zlib.decompress(message)
+    return json.loads(message.decode("utf-8"))
+
+
+def truncate(chunker, short_message, facility="test"):
+    message = BaseGELFHandler._pack_gelf_dict(make_gelf_dict(short_message, facility))
+    if chunker.compress:
+        message = zlib.compress(message)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return list(chunker.chunk_message(message))
+
+
+def test_truncated_message_fits():
+    chunker = GELFTruncatingChunker(chunk_size=100, compress=True)
+    short_message = os.urandom(20000).hex()
+    chunks = truncate(chunker, short_message)
+
+    assert len(chunks) <= GELF_MAX_CHUNK_NUMBER
+    gelf_dict = unchunk(chunks, compress=True)
+    # booleans are sanitized into strings
+    assert gelf_dict["_chunk_overflow"] == "True"
+    assert short_message.startswith(gelf_dict["short_message"])
+
+
+def test_truncated_message_is_longest_fitting_prefix():
+    # multi-byte characters make the truncation estimate overflow
+    chunker = GELFTruncatingChunker(chunk_size=100, compress=False)
+    short_message = "€" * 20000
+    chunks = truncate(chunker, short_message)
+
+    assert len(chunks) <= GELF_MAX_CHUNK_NUMBER
+    gelf_dict = unchunk(chunks, compress=False)
+    truncated_length = len(gelf_dict["short_message"])
+    assert 0 < truncated_length < len(short_message)
+
+    # one more character chunk overflows
+    gelf_dict["short_message"] = short_message[: truncated_length + 1]
+    longer = BaseGELFHandler._pack_gelf_dict(gelf_dict)
+    assert chunker._message_chunk_number(longer) > GELF_MAX_CHUNK_NUMBER
+
+
+def test_truncation_failure_dropped():
+    # even the simplified GELF log without short_message chunk overflows
+    chunker = GELFTruncatingChunker(chunk_size=1, compress=False)
+    assert truncate(chunker, "x", facility="x" * GELF_MAX_CHUNK_NUMBER) == []
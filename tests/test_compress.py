@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pytests for the ``compressor`` options of the GELF handlers"""
+
+import json
+import logging
+import zlib
+
+import pytest
+
+from graylog.compress import make_zstd_compressor
+from graylog.handlers import GELFTruncatingChunker
+from graylog.udp import GELFUDPHandler
+
+
+def test_zlib_compressor_default():
+    handler = GELFUDPHandler("127.0.0.1")
+    record = logging.makeLogRecord({"msg": "compressed"})
+    pickle = handler.makePickle(record)
+    assert zlib.decompress(pickle).startswith(b'{"version":"1.0"')
+
+
+def test_unsupported_compressor_rejected():
+    with pytest.raises(ValueError):
+        GELFUDPHandler("127.0.0.1", compressor="lz4")
+
+
+def test_zstd_dict_requires_dict_path():
+    with pytest.raises(ValueError):
+        make_zstd_compressor("zstd_dict", 1)
+
+
+def test_truncating_chunker_rejects_zstd():
+    chunker = GELFTruncatingChunker(compress=True)
+    with pytest.raises(ValueError):
+        GELFUDPHandler("127.0.0.1", gelf_chunker=chunker, compressor="zstd")
+
+
+def test_truncating_chunker_without_compression_accepts_zstd():
+    chunker = GELFTruncatingChunker(compress=False)
+    handler = GELFUDPHandler(
+        "127.0.0.1", gelf_chunker=chunker, compress=False, compressor="zstd"
+    )
+    assert handler.gelf_chunker is chunker
+
+
+def test_zstd_compressor_round_trip():
+    zstandard = pytest.importorskip("zstandard")
+    handler = GELFUDPHandler("127.0.0.1", compressor="zstd")
+    record = logging.makeLogRecord({"msg": "compressed"})
+    pickle = handler.makePickle(record)
+
+    message = zstandard.ZstdDecompressor().decompress(pickle)
+    assert json.loads(message)["short_message"] == "compressed"
+
+
+def test_zstd_dict_compressor_round_trip(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    handler = GELFUDPHandler("127.0.0.1")
+    samples = [
+        handler._pack_gelf_dict(
+            handler._make_gelf_dict(
+                logging.makeLogRecord({"msg": "request %d served" % i, "levelno": 20})
+            )
+        )
+        for i in range(1000)
+    ]
+    zstd_dict = zstandard.train_dictionary(1024, samples)
+    zstd_dict_path = tmp_path / "gelf.dict"
+    zstd_dict_path.write_bytes(zstd_dict.as_bytes())
+
+    handler = GELFUDPHandler(
+        "127.0.0.1", compressor="zstd_dict", zstd_dict_path=str(zstd_dict_path)
+    )
+    record = logging.makeLogRecord({"msg": "request served"})
+    pickle = handler.makePickle(record)
+
+    # the frame references the dictionary, it cannot be decompressed without it
+    with pytest.raises(zstandard.ZstdError):
+        zstandard.ZstdDecompressor().decompress(pickle)
+    message = zstandard.ZstdDecompressor(dict_data=zstd_dict).decompress(pickle)
+    assert json.loads(message)["short_message"] == "request served"
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pytests for :class:`graylog.http.GELFHTTPHandler`"""
+
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from graylog.http import GELFHTTPHandler
+
+
+class GELFHTTPServer(ThreadingHTTPServer):
+    """Local GELF HTTP input recording the received GELF logs"""
+
+    daemon_threads = True
+
+    def __init__(self, close_after_reply=False, reply_delay=0.0):
+        ThreadingHTTPServer.__init__(self, ("127.0.0.1", 0), GELFRequestHandler)
+        self.close_after_reply = close_after_reply
+        self.reply_delay = reply_delay
+        self.messages = []
+        self.clients = set()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class GELFRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.messages.append(json.loads(zlib.decompress(body)))
+        self.server.clients.add(self.client_address)
+        time.sleep(self.server.reply_delay)
+        self.send_response(202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        # close the keep-alive connection without announcing it
+        self.close_connection = self.server.close_after_reply
+
+    def log_message(self, *args):
+        pass
+
+
+def test_keep_alive_connection_reused(make_logger):
+    server = GELFHTTPServer()
+    handler = GELFHTTPHandler("127.0.0.1", server.server_port)
+    logger = make_logger(handler)
+    try:
+        for i in range(3):
+            logger.error("message %d", i)
+    finally:
+        handler.close()
+        server.stop()
+    assert [m["short_message"] for m in server.messages] == [
+        "message 0",
+        "message 1",
+        "message 2",
+    ]
+    assert len(server.clients) == 1
+
+
+def test_reconnect_after_server_closed_connection(make_logger):
+    server = GELFHTTPServer(close_after_reply=True)
+    handler = GELFHTTPHandler("127.0.0.1", server.server_port)
+    errors = []
+    handler.handleError = errors.append
+    logger = make_logger(handler)
+    try:
+        for i in range(3):
+            logger.error("message %d", i)
+            # let the server close the connection before the next log
+            time.sleep(0.1)
+    finally:
+        handler.close()
+        server.stop()
+    assert not errors
+    assert [m["short_message"] for m in server.messages] == [
+        "message 0",
+        "message 1",
+        "message 2",
+    ]
+    assert len(server.clients) == 3
+
+
+def test_no_duplicate_on_timeout(make_logger):
+    server = GELFHTTPServer(reply_delay=0.5)
+    handler = GELFHTTPHandler("127.0.0.1", server.server_port, timeout=0.1)
+    errors = []
+    handler.handleError = errors.append
+    logger = make_logger(handler)
+    try:
+        logger.error("slow")
+        # leave the server time to receive a (wrongly) resent log
+        time.sleep(1)
+    finally:
+        handler.close()
+        server.stop()
+    assert len(errors) == 1
+    assert [m["short_message"] for m in server.messages] == ["slow"]
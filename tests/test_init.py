@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pytests for the lazy handler imports of :mod:`graylog`"""
+
+import subprocess
+import sys
+
+import graylog
+
+
+def test_import_does_not_load_transports():
+    code = (
+        "import sys, graylog; "
+        "print('ssl' in sys.modules, 'http.client' in sys.modules)"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code])
+    assert output.split() == [b"False", b"False"]
+
+
+def test_dir_lists_handlers_once():
+    assert graylog.GELFUDPHandler
+    names = dir(graylog)
+    assert "GELFUDPHandler" in names
+    assert len(names) == len(set(names))
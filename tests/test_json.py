@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pytests for the JSON serialization of GELF logs"""
+
+import dataclasses
+import datetime
+import enum
+import json
+
+import pytest
+
+import graylog.handlers
+from graylog.handlers import BaseGELFHandler
+
+
+class Color(enum.IntEnum):
+    RED = 1
+
+
+class Name(str):
+    pass
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+def test_orjson_and_json_parity(monkeypatch):
+    pytest.importorskip("orjson")
+    gelf_dict = {
+        "version": "1.1",
+        "short_message": Name("subclassed"),
+        "_timestamp": datetime.datetime(2020, 1, 2, 3, 4, 5),
+        "_point": Point(1, 2),
+        "_color": Color.RED,
+        "_raw": b"bytes",
+        "_flag": True,
+    }
+    with_orjson = BaseGELFHandler._pack_gelf_dict(dict(gelf_dict))
+    monkeypatch.setattr(graylog.handlers, "orjson", None)
+    with_json = BaseGELFHandler._pack_gelf_dict(dict(gelf_dict))
+
+    assert json.loads(with_orjson) == json.loads(with_json)